@@ -0,0 +1,96 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled line scanner for LogParser.parse_lines (analyze_rpsv.py / analyze_jcmp.py)
+Build in place with: pip install cython && cythonize -i _parse_core.pyx
+Matches the pure-Python parser line for line; METRIC JSON is still handed back to the parser
+"""
+
+cdef inline bint _is_digit(Py_UCS4 c):
+    # Same digit set as str.isdecimal() in the Python scanner; float()/int() accept all of them
+    return c.isdecimal()
+
+cdef object _find_value(str line, str tag, bint signed, bint frac, str suffix):
+    """Text of the first `tag(-?)digits(.digits)?suffix` match, as _value_after/_digits_after"""
+    cdef Py_ssize_t n = len(line)
+    cdef Py_ssize_t i = line.find(tag)
+    cdef Py_ssize_t start, j, k
+    while i >= 0:
+        start = i + len(tag)
+        j = start
+        if signed and j < n and line[j] == u'-':
+            j += 1
+        k = j
+        while k < n and _is_digit(line[k]):
+            k += 1
+        if k > j:
+            if frac and k + 1 < n and line[k] == u'.' and _is_digit(line[k + 1]):
+                k += 2
+                while k < n and _is_digit(line[k]):
+                    k += 1
+            if line.startswith(suffix, k):
+                return line[start:k]
+        i = line.find(tag, i + 1)
+    return None
+
+def parse_lines(parser, lines, tuple debug_tags):
+    """Parse an iterable of log lines into parser's sample buffers and counters"""
+    cdef str line
+    cdef str tag
+    cdef Py_ssize_t idx
+    cdef Py_ssize_t ws_lane_count = parser.ws_lane_count
+    cdef Py_ssize_t rpsv_debug_count = parser.rpsv_debug_count
+    cdef bint is_debug
+    cdef bint verbose = parser.verbose
+    cdef double interval
+
+    tcp_latencies = parser.tcp_latencies
+    rpsv_playback_errors = parser.rpsv_playback_errors
+    rpsv_inter_playback = parser.rpsv_inter_playback
+    rpsv_buffer_sizes = parser.rpsv_buffer_sizes
+    parse_metric = parser._parse_metric
+
+    try:
+        for line in lines:
+            if u'METRIC ' in line:
+                idx = line.find(u'METRIC ')
+                if (idx == 0 or line[:idx].isspace()) and parse_metric(line, idx):
+                    continue
+
+            if u'WS lane' in line:
+                ws_lane_count += 1
+                value = _find_value(line, u'latency=', False, True, u'ms')
+                if value is not None:
+                    tcp_latencies.append(float(value))
+                elif verbose and ws_lane_count <= 3:
+                    print(f"  DEBUG: WS lane line found but no latency match: {line[:80]}")
+                continue
+
+            is_debug = False
+            for tag in debug_tags:
+                if tag in line:
+                    is_debug = True
+                    break
+            if not is_debug:
+                continue
+            rpsv_debug_count += 1
+
+            if u'PlaybackError=' in line:
+                value = _find_value(line, u'PlaybackError=', True, True, u'ms')
+                if value is not None:
+                    rpsv_playback_errors.append(float(value))
+                    if u'InterPlayback=' in line:
+                        value = _find_value(line, u'InterPlayback=', False, True, u'ms')
+                        if value is not None:
+                            interval = float(value)
+                            if interval > 0:
+                                rpsv_inter_playback.append(interval)
+
+            if u'bufferSizeMs' in line:
+                value = _find_value(line, u'bufferSizeMs=', False, False, u'')
+                if value is not None:
+                    buffer = int(value)
+                    if 5 <= buffer <= 500:
+                        rpsv_buffer_sizes.append(buffer)
+    finally:
+        parser.ws_lane_count = ws_lane_count
+        parser.rpsv_debug_count = rpsv_debug_count
@@ -4,69 +4,336 @@ RPSV vs TCP Protocol Analysis Tool
 Parses server logs and Dev Stats snapshots to compare TCP (WS immediate) vs RPSV (RTC + buffer)
 """
 
+import heapq
+import io
 import json
-import re
+import math
+import mmap
+import os
 import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Dict, Optional
 import statistics
 
+# numpy and matplotlib are imported on first use (_get_np/_get_plt) so runs
+# that never plot, and --help, skip their import cost; None = not tried yet
+np = None
+plt = None
+HAS_NUMPY = None
+HAS_MATPLOTLIB = None
+
+def _get_np():
+    """Import numpy on first use; returns None when it is not installed"""
+    global np, HAS_NUMPY
+    if HAS_NUMPY is None:
+        try:
+            import numpy as np
+            HAS_NUMPY = True
+        except ImportError:
+            HAS_NUMPY = False
+    return np
+
+def _get_plt():
+    """Import matplotlib.pyplot (and numpy) on first use; returns None when unavailable"""
+    global plt, HAS_MATPLOTLIB
+    if HAS_MATPLOTLIB is None:
+        try:
+            import matplotlib.pyplot as plt
+            HAS_MATPLOTLIB = _get_np() is not None
+        except ImportError:
+            HAS_MATPLOTLIB = False
+    return plt if HAS_MATPLOTLIB else None
+
+# Optional faster decoder for METRIC JSON payloads
 try:
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
-    HAS_MATPLOTLIB = True
+    import orjson
+    HAS_ORJSON = True
 except ImportError:
-    HAS_MATPLOTLIB = False
-    
+    HAS_ORJSON = False
+
+# Optional approximate percentiles for --summary-only runs
 try:
-    import numpy as np
-    HAS_NUMPY = True
+    from tdigest import TDigest
+    HAS_TDIGEST = True
 except ImportError:
-    HAS_NUMPY = False
-    if HAS_MATPLOTLIB:
-        print("WARNING: numpy not available. Install with: pip install numpy")
+    HAS_TDIGEST = False
 
-if not HAS_MATPLOTLIB:
-    print("WARNING: matplotlib not available. Install with: pip install matplotlib numpy")
+# Optional compiled line scanner, built with: cythonize -i _parse_core.pyx
+try:
+    import _parse_core
+    HAS_PARSE_CORE = True
+except ImportError:
+    HAS_PARSE_CORE = False
 
-@dataclass
-class MetricSample:
-    timestamp: float
-    value: float
-    protocol: str  # 'tcp' or 'rpsv'
+# Line tags that mark debug output from the RTC lane
+_DEBUG_TAGS = ('RPSV Debug',)
+# Buffer sizes are stored as int32; larger values are not real buffer sizes and are dropped
+_BUFFER_MS_RANGE = range(-2**31, 2**31)
+# Decodes METRIC payloads in place, without slicing/stripping the line first
+_DECODER = json.JSONDecoder()
+
+# Samples a RunningStats buffers before folding them in (512 KiB of doubles)
+_STATS_BLOCK = 64 * 1024
+
+# Logs smaller than this are parsed in-process; worker startup would dominate
+_PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Upper bound on the bytes one worker decodes at a time
+_CHUNK_BYTES = 32 * 1024 * 1024
+
+# Line plots longer than this are downsampled to _PLOT_TARGET_POINTS before drawing
+_PLOT_MAX_POINTS = 2000
+_PLOT_TARGET_POINTS = 1000
+
+def _decode_metric(line: str, start: int):
+    """Decode the METRIC payload at line[start:] with json.loads semantics
+    
+    Only whitespace may surround the JSON value. orjson is tried first; anything
+    it rejects (e.g. NaN/Infinity, which json.loads accepts) goes to the stdlib
+    decoder, so the result does not depend on whether orjson is installed.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(line[start:])
+        except orjson.JSONDecodeError:
+            pass
+    brace = line.index('{', start)
+    if line[start:brace].strip():
+        raise ValueError(f"METRIC payload is not a JSON object: {line[start:brace]!r}")
+    obj, end = _DECODER.raw_decode(line, brace)
+    if line[end:].strip():
+        raise ValueError(f"Extra data after METRIC payload at column {end}")
+    return obj
+
+def _buffer_ms(value) -> Optional[int]:
+    """bufferSizeMs as an int for the int32 buffer columns, or None if it is unusable"""
+    try:
+        buffer = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return buffer if buffer in _BUFFER_MS_RANGE else None
+
+def _value_after(line: str, tag: str, suffix: str = 'ms', signed: bool = False) -> Optional[str]:
+    """Text of the first `tag<number><suffix>` in line (number is -?digits[.digits])"""
+    i = line.find(tag)
+    while i >= 0:
+        j = i + len(tag)
+        k = line.find(suffix, j)
+        if k < 0:
+            return None
+        value = line[j:k]
+        number = value[1:] if signed and value.startswith('-') else value
+        whole, dot, frac = number.partition('.')
+        if whole.isdecimal() and (not dot or frac.isdecimal()):
+            return value
+        i = line.find(tag, i + 1)
+    return None
+
+def _digits_after(line: str, tag: str) -> Optional[str]:
+    """Run of digits directly following the first matching `tag` in line"""
+    i = line.find(tag)
+    while i >= 0:
+        j = k = i + len(tag)
+        while k < len(line) and line[k].isdecimal():
+            k += 1
+        if k > j:
+            return line[j:k]
+        i = line.find(tag, i + 1)
+    return None
+
+def _pct(values, q: float):
+    """Nearest-rank percentile via a partial sort around the one index needed"""
+    k = max(int(math.ceil(q / 100 * len(values))) - 1, 0)
+    if _get_np():
+        return np.partition(values, k)[k]
+    return heapq.nlargest(len(values) - k, values)[-1]
+
+class RunningStats:
+    """Streaming stand-in for a sample array: mean/variance in bounded memory
+    
+    Supports the append/extend/len calls LogParser and main() make on sample
+    buffers. Samples are buffered into fixed-size blocks; each full block is
+    folded in at once (Chan et al. combination for mean/variance, distinct
+    values with their counts for the t-digest), so no per-sample Python work
+    is done beyond the append. Median and percentiles come from the t-digest
+    when tdigest is installed and percentiles=True, and are NaN otherwise.
+    """
+    
+    def __init__(self, absolute: bool = False, percentiles: bool = True):
+        self.absolute = absolute  # accumulate |x|, as playback_error_stats does
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.digest = TDigest() if HAS_TDIGEST and percentiles else None
+        self.block = array('d')
+    
+    def __len__(self):
+        return self.n + len(self.block)
+    
+    def append(self, x):
+        self.block.append(abs(x) if self.absolute else x)
+        if len(self.block) >= _STATS_BLOCK:
+            self.flush()
+    
+    def extend(self, values):
+        if not isinstance(values, RunningStats):
+            for x in values:
+                self.append(x)
+            return
+        # Merging worker results: fold both pending blocks, then combine
+        self.flush()
+        values.flush()
+        self._combine(values.n, values.mean, values.m2, values.min, values.max)
+        if self.digest is not None and values.digest is not None and values.n:
+            self.digest = self.digest + values.digest
+    
+    def flush(self):
+        """Fold the pending block into the running statistics and the digest"""
+        block = self.block
+        if not block:
+            return
+        self.block = array('d')
+        if _get_np():
+            values = np.frombuffer(block, dtype=np.float64)
+            mean = values.mean()
+            m2 = np.square(values - mean).sum()
+            self._combine(len(values), float(mean), float(m2), float(values.min()), float(values.max()))
+            if self.digest is not None:
+                # Millisecond samples repeat a lot, so this is far fewer digest updates
+                distinct, counts = np.unique(values, return_counts=True)
+                for x, w in zip(distinct.tolist(), counts.tolist()):
+                    self.digest.update(x, w)
+            return
+        mean = math.fsum(block) / len(block)
+        m2 = math.fsum((x - mean) ** 2 for x in block)
+        self._combine(len(block), mean, m2, min(block), max(block))
+        if self.digest is not None:
+            for x, w in sorted(Counter(block).items()):
+                self.digest.update(x, w)
+    
+    def _combine(self, n_b: int, mean_b: float, m2_b: float, min_b: float, max_b: float):
+        # Chan et al. pairwise combination of two (count, mean, M2) summaries
+        if not n_b:
+            return
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        self.min = min(self.min, min_b)
+        self.max = max(self.max, max_b)
+    
+    def percentile(self, q: float) -> float:
+        self.flush()
+        if self.digest is None or not self.n:
+            return math.nan
+        return self.digest.percentile(q)
+    
+    def stats(self):
+        self.flush()
+        variance = self.m2 / (self.n - 1) if self.n > 1 else 0
+        return {
+            'mean': self.mean,
+            'median': self.percentile(50),
+            'stddev': math.sqrt(variance),
+            'variance': variance,
+            'min': self.min,
+            'max': self.max,
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'count': self.n
+        }
+
+class SampleCount:
+    """Sample buffer stand-in that only counts, for columns no statistic is reported on"""
+    
+    def __init__(self):
+        self.n = 0
+    
+    def __len__(self):
+        return self.n
+    
+    def append(self, x):
+        self.n += 1
+    
+    def extend(self, values):
+        self.n += len(values)
 
 @dataclass
 class AnalysisResults:
     protocol: str
-    latency_samples: List[MetricSample] = field(default_factory=list)
-    inter_arrival_times: List[float] = field(default_factory=list)
-    inter_playback_times: List[float] = field(default_factory=list)
-    playback_errors: List[float] = field(default_factory=list)
-    buffer_sizes: List[MetricSample] = field(default_factory=list)
-    
+    # Samples are stored column-wise in typed buffers: (timestamp, value) pairs
+    # split into parallel arrays instead of one object per sample
+    latency_ts: array = field(default_factory=lambda: array('d'))
+    latency_vals: array = field(default_factory=lambda: array('d'))
+    inter_arrival_times: array = field(default_factory=lambda: array('d'))
+    # Millisecond intervals/errors need no more than float32; buffer sizes int32
+    inter_playback_times: array = field(default_factory=lambda: array('f'))
+    playback_errors: array = field(default_factory=lambda: array('f'))
+    buffer_ts: array = field(default_factory=lambda: array('d'))
+    buffer_vals: array = field(default_factory=lambda: array('i'))
+    # In --summary-only runs the value columns hold RunningStats accumulators
+    # instead of samples (timestamps and inter-arrival times stay arrays).
+    # The *_stats properties are computed on first access and cached, so they
+    # must only be read once all samples have been loaded
+    
+    @cached_property
     def latency_stats(self):
-        if not self.latency_samples:
+        if not self.latency_vals:
             return None
-        values = [s.value for s in self.latency_samples]
+        if isinstance(self.latency_vals, RunningStats):
+            return self.latency_vals.stats()
+        if _get_np():
+            values = np.frombuffer(self.latency_vals, dtype=np.float64)
+            return {
+                'mean': values.mean(),
+                'median': np.median(values),
+                'stddev': values.std(ddof=1) if len(values) > 1 else 0,
+                'min': values.min(),
+                'max': values.max(),
+                'p95': _pct(values, 95),
+                'p99': _pct(values, 99),
+                'count': len(values)
+            }
+        values = self.latency_vals
         return {
             'mean': statistics.mean(values),
             'median': statistics.median(values),
             'stddev': statistics.stdev(values) if len(values) > 1 else 0,
             'min': min(values),
             'max': max(values),
-            'p95': np.percentile(values, 95) if HAS_NUMPY else (sorted(values)[int(len(values) * 0.95)] if len(values) > 0 else 0),
-            'p99': np.percentile(values, 99) if HAS_NUMPY else (sorted(values)[int(len(values) * 0.99)] if len(values) > 0 else 0),
+            'p95': _pct(values, 95),
+            'p99': _pct(values, 99),
             'count': len(values)
         }
     
+    @cached_property
     def jitter_stats(self):
         if not self.inter_arrival_times and not self.inter_playback_times:
             return None
         times = self.inter_playback_times if self.inter_playback_times else self.inter_arrival_times
         if len(times) < 2:
             return None
+        if isinstance(times, RunningStats):
+            stats = times.stats()
+            return {k: stats[k] for k in ('mean', 'stddev', 'variance', 'min', 'max', 'count')}
+        if _get_np():
+            times = np.asarray(times, dtype=np.float64)
+            variance = times.var(ddof=1)
+            return {
+                'mean': times.mean(),
+                'stddev': np.sqrt(variance),
+                'variance': variance,
+                'min': times.min(),
+                'max': times.max(),
+                'count': len(times)
+            }
         return {
             'mean': statistics.mean(times),
             'stddev': statistics.stdev(times),
@@ -76,145 +343,255 @@ class AnalysisResults:
             'count': len(times)
         }
     
+    @cached_property
     def playback_error_stats(self):
         if not self.playback_errors:
             return None
+        if isinstance(self.playback_errors, RunningStats):
+            stats = self.playback_errors.stats()
+            return {k: stats[k] for k in ('mean', 'median', 'stddev', 'max', 'p95', 'count')}
+        if _get_np():
+            errors = np.abs(np.asarray(self.playback_errors, dtype=np.float64))  # Use absolute values
+            return {
+                'mean': errors.mean(),
+                'median': np.median(errors),
+                'stddev': errors.std(ddof=1) if len(errors) > 1 else 0,
+                'max': errors.max(),
+                'p95': _pct(errors, 95),
+                'count': len(errors)
+            }
         errors = [abs(e) for e in self.playback_errors]  # Use absolute values
         return {
             'mean': statistics.mean(errors),
             'median': statistics.median(errors),
             'stddev': statistics.stdev(errors) if len(errors) > 1 else 0,
             'max': max(errors),
-            'p95': np.percentile(errors, 95) if HAS_NUMPY else (sorted(errors)[int(len(errors) * 0.95)] if len(errors) > 0 else 0),
+            'p95': _pct(errors, 95),
             'count': len(errors)
         }
 
 class LogParser:
     """Parse server logs for metrics"""
     
-    def __init__(self):
-        self.tcp_latencies = []
-        self.tcp_timestamps = []
-        self.rpsv_playback_errors = []
-        self.rpsv_inter_playback = []
-        self.rpsv_buffer_sizes = []
-        self.rpsv_rtt = []
+    def __init__(self, summary_only: bool = False, verbose: bool = True):
+        self.summary_only = summary_only
+        # Print the "first few" DEBUG lines; parallel workers past the first chunk
+        # run quiet so a chunked parse prints no more of them than a serial one
+        self.verbose = verbose
+        self.metric_count = 0
+        self.ws_lane_count = 0
+        self.rpsv_debug_count = 0
+        # Typed buffers keep samples unboxed and let merge()/main() copy them in bulk
+        self.tcp_timestamps = array('d')
+        if summary_only:
+            # Only running statistics; jitter reports no percentiles, so it skips the
+            # t-digest, and buffer sizes are plot-only, so they are just counted
+            self.tcp_latencies = RunningStats()
+            self.rpsv_playback_errors = RunningStats(absolute=True)
+            self.rpsv_inter_playback = RunningStats(percentiles=False)
+            self.rpsv_buffer_sizes = SampleCount()
+            self.rpsv_rtt = RunningStats()
+            return
+        self.tcp_latencies = array('d')
+        # Same typecodes as the AnalysisResults columns they are copied into
+        self.rpsv_playback_errors = array('f')
+        self.rpsv_inter_playback = array('f')
+        self.rpsv_buffer_sizes = array('i')
+        self.rpsv_rtt = array('d')
         
-    def parse_log_file(self, log_path: Path):
-        """Parse server log file"""
+    def parse_log_file(self, log_path: Path, workers: Optional[int] = None):
+        """Parse server log file, splitting large files across worker processes"""
         print(f"Parsing log file: {log_path}")
         
-        # Try multiple encodings
-        encodings = ['utf-16', 'utf-8', 'utf-8-sig', 'cp1252', 'latin-1']
-        file_content = None
-        for enc in encodings:
-            try:
-                with open(log_path, 'r', encoding=enc, errors='ignore') as f:
-                    file_content = f.readlines()
-                    break
-            except Exception:
-                continue
-        
-        if file_content is None:
-            print("ERROR: Could not read log file with any encoding")
+        # Pick the encoding from the byte order mark (PowerShell's Tee-Object
+        # writes UTF-16); anything without one is read as UTF-8
+        try:
+            with open(log_path, 'rb') as f:
+                head = f.read(4)
+        except OSError as e:
+            print(f"ERROR: Could not read log file: {e}")
             return
+        if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+            encoding = 'utf-16'
+        elif head.startswith(b'\xef\xbb\xbf'):
+            encoding = 'utf-8-sig'
+        else:
+            encoding = 'utf-8'
         
-        ws_lane_count = 0
-        rpsv_debug_count = 0
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and os.path.getsize(log_path) >= _PARALLEL_MIN_BYTES:
+            self._parse_parallel(log_path, encoding, workers)
+        else:
+            with open(log_path, 'r', encoding=encoding, errors='replace') as f:
+                self.parse_lines(f)
         
-        metric_count = 0
-        for line in file_content:
+        print(f"  Found {self.metric_count} METRIC lines, {self.ws_lane_count} 'WS lane' lines, {self.rpsv_debug_count} 'RPSV Debug' lines")
+    
+    def _parse_parallel(self, log_path: Path, encoding: str, workers: int):
+        """Parse newline-aligned byte ranges of the file in worker processes"""
+        with open(log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            codec, newline, start = _chunk_codec(encoding, mm[:4])
+            n_chunks = max(workers, len(mm) // _CHUNK_BYTES + 1)
+            bounds = _chunk_bounds(mm, start, n_chunks, newline)
+        
+        tasks = [(str(log_path), codec, a, b, self.summary_only, a == bounds[0])
+                 for a, b in zip(bounds, bounds[1:])]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields in submission order, so samples keep their file order
+            for part in executor.map(_parse_chunk, tasks):
+                self.merge(part)
+    
+    def merge(self, other: 'LogParser'):
+        """Append the samples and counters collected by another parser"""
+        self.tcp_latencies.extend(other.tcp_latencies)
+        self.tcp_timestamps.extend(other.tcp_timestamps)
+        self.rpsv_playback_errors.extend(other.rpsv_playback_errors)
+        self.rpsv_inter_playback.extend(other.rpsv_inter_playback)
+        self.rpsv_buffer_sizes.extend(other.rpsv_buffer_sizes)
+        self.rpsv_rtt.extend(other.rpsv_rtt)
+        self.metric_count += other.metric_count
+        self.ws_lane_count += other.ws_lane_count
+        self.rpsv_debug_count += other.rpsv_debug_count
+    
+    def _parse_metric(self, line: str, idx: int) -> bool:
+        """Parse a 'METRIC {json}' line whose tag starts at idx; True if it was consumed"""
+        self.metric_count += 1
+        try:
+            obj = _decode_metric(line, idx + len('METRIC '))
+            kind = obj.get('kind')
+            if kind == 'tcp_ws' and 'latencyMs' in obj:
+                self.tcp_latencies.append(float(obj['latencyMs']))
+                if 'ts' in obj:
+                    self.tcp_timestamps.append(float(obj['ts']))
+                return True
+            if kind == 'rpsv_playback':
+                if 'playbackErrorMs' in obj:
+                    self.rpsv_playback_errors.append(float(obj['playbackErrorMs']))
+                if 'interPlaybackMs' in obj and float(obj['interPlaybackMs']) > 0:
+                    self.rpsv_inter_playback.append(float(obj['interPlaybackMs']))
+                return True
+            if kind == 'rpsv_rtc':
+                # An unusable buffer value must not cost the RTT sample on the same line
+                buffer = _buffer_ms(obj.get('bufferSizeMs'))
+                if buffer is not None:
+                    self.rpsv_buffer_sizes.append(buffer)
+                if 'rttMs' in obj:
+                    self.rpsv_rtt.append(float(obj['rttMs']))
+                return True
+        except Exception as e:
+            # Debug: show first few parsing errors
+            if self.verbose and len(self.tcp_latencies) + len(self.rpsv_playback_errors) < 5:
+                print(f"  DEBUG: METRIC parse error: {e} for line: {line[:100]}")
+        return False
+    
+    def parse_lines(self, lines):
+        """Parse an iterable of log lines"""
+        if HAS_PARSE_CORE:
+            _parse_core.parse_lines(self, lines, _DEBUG_TAGS)
+            return
+        for line in lines:
             # Structured metrics: lines starting with 'METRIC ' followed by JSON
-            striped = line.lstrip()
-            if striped.startswith('METRIC '):
-                metric_count += 1
-                try:
-                    payload = striped[len('METRIC '):].strip()
-                    obj = json.loads(payload)
-                    kind = obj.get('kind')
-                    if kind == 'tcp_ws' and 'latencyMs' in obj:
-                        self.tcp_latencies.append(float(obj['latencyMs']))
-                        if 'ts' in obj:
-                            self.tcp_timestamps.append(float(obj['ts']))
-                        continue
-                    if kind == 'rpsv_playback':
-                        if 'playbackErrorMs' in obj:
-                            self.rpsv_playback_errors.append(float(obj['playbackErrorMs']))
-                        if 'interPlaybackMs' in obj and float(obj['interPlaybackMs']) > 0:
-                            self.rpsv_inter_playback.append(float(obj['interPlaybackMs']))
-                        continue
-                    if kind == 'rpsv_rtc':
-                        if 'bufferSizeMs' in obj:
-                            self.rpsv_buffer_sizes.append(int(obj['bufferSizeMs']))
-                        if 'rttMs' in obj:
-                            self.rpsv_rtt.append(float(obj['rttMs']))
-                        continue
-                except Exception as e:
-                    # Debug: show first few parsing errors
-                    if len(self.tcp_latencies) + len(self.rpsv_playback_errors) < 5:
-                        print(f"  DEBUG: METRIC parse error: {e} for line: {line[:100]}")
-                    pass
+            if 'METRIC ' in line:
+                idx = line.find('METRIC ')
+                if (idx == 0 or line[:idx].isspace()) and self._parse_metric(line, idx):
+                    continue
             # TCP mode: WS lane latency logs
             # Format: "🎯 WS lane: noteOn (latency=23ms)" or with encoding issues
             # Match "WS lane" anywhere in line, then extract latency
             if 'WS lane' in line:
-                ws_lane_count += 1
-                ws_latency_match = re.search(r'latency=(\d+(?:\.\d+)?)ms', line)
-                if ws_latency_match:
+                self.ws_lane_count += 1
+                ws_latency = _value_after(line, 'latency=')
+                if ws_latency is not None:
                     try:
-                        latency = float(ws_latency_match.group(1))
+                        latency = float(ws_latency)
                         self.tcp_latencies.append(latency)
                     except ValueError:
                         pass
                 else:
                     # Debug: show first few unmatched lines
-                    if ws_lane_count <= 3:
+                    if self.verbose and self.ws_lane_count <= 3:
                         print(f"  DEBUG: WS lane line found but no latency match: {line[:80]}")
+                continue
             
-            if 'RPSV Debug' in line:
-                rpsv_debug_count += 1
+            # Everything below only applies to lines carrying one of _DEBUG_TAGS
+            for tag in _DEBUG_TAGS:
+                if tag in line:
+                    break
+            else:
+                continue
+            self.rpsv_debug_count += 1
             
             # RPSV mode: Playback error and inter-playback interval
             # Format: "RPSV Debug: PlaybackError=2ms, InterPlayback=500ms"
             # InterPlayback is optional
-            playback_error_match = re.search(r'PlaybackError=(-?\d+(?:\.\d+)?)ms', line)
-            if playback_error_match and 'RPSV Debug' in line:
-                try:
-                    error = float(playback_error_match.group(1))
-                    self.rpsv_playback_errors.append(error)
-                    
-                    # Check for InterPlayback on same line
-                    inter_playback_match = re.search(r'InterPlayback=(\d+(?:\.\d+)?)ms', line)
-                    if inter_playback_match:
-                        interval = float(inter_playback_match.group(1))
-                        # Only add meaningful intervals (filter out 0ms which indicates simultaneous events)
-                        if interval > 0:
-                            self.rpsv_inter_playback.append(interval)
-                except ValueError:
-                    pass
+            if 'PlaybackError=' in line:
+                playback_error = _value_after(line, 'PlaybackError=', signed=True)
+                if playback_error is not None:
+                    try:
+                        error = float(playback_error)
+                        self.rpsv_playback_errors.append(error)
+                        
+                        # Check for InterPlayback on same line
+                        if 'InterPlayback=' in line:
+                            inter_playback = _value_after(line, 'InterPlayback=')
+                            if inter_playback is not None:
+                                interval = float(inter_playback)
+                                # Only add meaningful intervals (filter out 0ms which indicates simultaneous events)
+                                if interval > 0:
+                                    self.rpsv_inter_playback.append(interval)
+                    except ValueError:
+                        pass
             
             # Buffer size from RTC latency logs
             # Format: "RPSV Debug: RTC latency=0ms, bufferSizeMs=15"
-            if 'bufferSizeMs' in line and 'RPSV Debug' in line:
-                buffer_match = re.search(r'bufferSizeMs=(\d+)', line)
-                if buffer_match:
+            if 'bufferSizeMs' in line:
+                buffer_size = _digits_after(line, 'bufferSizeMs=')
+                if buffer_size is not None:
                     try:
-                        buffer = int(buffer_match.group(1))
+                        buffer = int(buffer_size)
                         # Only track if reasonable (not initial default)
                         if 5 <= buffer <= 500:
                             self.rpsv_buffer_sizes.append(buffer)
                     except ValueError:
                         pass
-            
-            # Also extract RTC latency for RPSV mode
-            if 'RPSV Debug' in line and 'RTC latency' in line:
-                rtc_latency_match = re.search(r'RTC latency=(\d+(?:\.\d+)?)ms', line)
-                if rtc_latency_match:
-                    # Note: These are stored but not categorized separately
-                    # They contribute to understanding RPSV latency
-                    pass
-        
-        print(f"  Found {metric_count} METRIC lines, {ws_lane_count} 'WS lane' lines, {rpsv_debug_count} 'RPSV Debug' lines")
+
+def _chunk_codec(encoding: str, head: bytes):
+    """Return (codec, newline bytes, first data offset) for decoding raw chunks"""
+    if encoding == 'utf-16':
+        # Only the first chunk carries the BOM, so pin the byte order it declares
+        if head.startswith(b'\xfe\xff'):
+            return 'utf-16-be', b'\x00\n', 2
+        return 'utf-16-le', b'\n\x00', 2
+    if encoding == 'utf-8-sig' and head.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8', b'\n', 3
+    return encoding, b'\n', 0
+
+def _chunk_bounds(mm, start: int, n_chunks: int, newline: bytes) -> List[int]:
+    """Split mm[start:] into about n_chunks ranges that end right after a newline"""
+    size = len(mm)
+    step = max((size - start) // n_chunks, 1)
+    unit = len(newline)
+    bounds = [start]
+    for i in range(1, n_chunks):
+        pos = mm.find(newline, max(start + i * step, bounds[-1]))
+        # Multi-byte newlines must sit on a code unit boundary
+        while pos != -1 and (pos - start) % unit:
+            pos = mm.find(newline, pos + 1)
+        if pos == -1:
+            break
+        bounds.append(pos + unit)
+    bounds.append(size)
+    return bounds
+
+def _parse_chunk(task):
+    """Worker entry point: parse one byte range of a log file"""
+    log_path, codec, start, end, summary_only, verbose = task
+    with open(log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode(codec, errors='replace')
+    parser = LogParser(summary_only, verbose)
+    parser.parse_lines(io.StringIO(text, newline=None))
+    return parser
 
 class DevStatsParser:
     """Parse Dev Stats JSON snapshots"""
@@ -241,7 +618,7 @@ class DevStatsParser:
         for json_file in dir_path.glob('*.json'):
             self.parse_json_file(json_file)
 
-def analyze(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
+def analyze(tcp_results: AnalysisResults, rpsv_results: AnalysisResults, plots: bool = True):
     """Generate analysis report and visualizations"""
     
     print("\n" + "="*60)
@@ -250,13 +627,13 @@ def analyze(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
     
     # TCP Statistics
     print("\n[TCP] WebSocket Immediate Mode:")
-    tcp_latency = tcp_results.latency_stats()
+    tcp_latency = tcp_results.latency_stats
     if tcp_latency:
         print(f"  Latency: mean={tcp_latency['mean']:.2f}ms, median={tcp_latency['median']:.2f}ms")
         print(f"           stddev={tcp_latency['stddev']:.2f}ms, p95={tcp_latency['p95']:.2f}ms")
         print(f"           range=[{tcp_latency['min']:.2f}, {tcp_latency['max']:.2f}]ms")
     
-    tcp_jitter = tcp_results.jitter_stats()
+    tcp_jitter = tcp_results.jitter_stats
     if tcp_jitter:
         print(f"  Inter-arrival jitter: mean={tcp_jitter['mean']:.2f}ms")
         print(f"                       stddev={tcp_jitter['stddev']:.2f}ms")
@@ -264,18 +641,18 @@ def analyze(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
     
     # RPSV Statistics
     print("\n[RPSV] RTC + Adaptive Buffer Mode:")
-    rpsv_latency = rpsv_results.latency_stats()
+    rpsv_latency = rpsv_results.latency_stats
     if rpsv_latency:
         print(f"  Latency: mean={rpsv_latency['mean']:.2f}ms, median={rpsv_latency['median']:.2f}ms")
         print(f"           stddev={rpsv_latency['stddev']:.2f}ms, p95={rpsv_latency['p95']:.2f}ms")
     
-    rpsv_jitter = rpsv_results.jitter_stats()
+    rpsv_jitter = rpsv_results.jitter_stats
     if rpsv_jitter:
         print(f"  Inter-playback jitter: mean={rpsv_jitter['mean']:.2f}ms")
         print(f"                        stddev={rpsv_jitter['stddev']:.2f}ms")
         print(f"                        variance={rpsv_jitter['variance']:.2f}ms^2")
     
-    rpsv_error = rpsv_results.playback_error_stats()
+    rpsv_error = rpsv_results.playback_error_stats
     if rpsv_error:
         print(f"  Playback error: mean={rpsv_error['mean']:.2f}ms, median={rpsv_error['median']:.2f}ms")
         print(f"                  max={rpsv_error['max']:.2f}ms, p95={rpsv_error['p95']:.2f}ms")
@@ -294,11 +671,34 @@ def analyze(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
         print(f"  Playback accuracy: {rpsv_error['mean']:.2f}ms avg error (target: <5ms)")
     
     # Generate visualizations
-    if HAS_MATPLOTLIB:
+    if not plots:
+        return
+    if _get_plt():
         generate_plots(tcp_results, rpsv_results)
     else:
         print("\nWARNING: Install matplotlib to generate plots: pip install matplotlib numpy")
 
+def _downsample_indices(values, n_out: int):
+    """Indices of about n_out points that keep the min/max shape of a long series"""
+    try:
+        from tsdownsample import MinMaxLTTBDownsampler
+        return MinMaxLTTBDownsampler().downsample(values, n_out=n_out)
+    except ImportError:
+        pass
+    # M4-style fallback: keep the min and max of each bucket, in index order
+    edges = np.linspace(0, len(values), n_out // 2 + 1, dtype=np.int64)
+    idx = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        bucket = values[a:b]
+        idx.append(a + bucket.argmin())
+        idx.append(a + bucket.argmax())
+    return np.unique(idx)
+
+def _hist_bars(ax, values, bins, **kwargs):
+    """Draw a histogram binned once with np.histogram, as bars on ax"""
+    counts, edges = np.histogram(values, bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **kwargs)
+
 def generate_plots(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
     """Generate visualization plots"""
     print("\nGenerating plots...")
@@ -308,16 +708,20 @@ def generate_plots(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
     
     # Plot 1: Latency Histograms
     ax1 = axes[0, 0]
-    has_data = False
-    if tcp_results.latency_samples:
-        tcp_values = [s.value for s in tcp_results.latency_samples]
-        ax1.hist(tcp_values, bins=30, alpha=0.6, label='TCP', color='blue', edgecolor='black')
-        has_data = True
-    if rpsv_results.latency_samples:
-        rpsv_values = [s.value for s in rpsv_results.latency_samples]
-        ax1.hist(rpsv_values, bins=30, alpha=0.6, label='RPSV', color='green', edgecolor='black')
-        has_data = True
-    if not has_data:
+    tcp_values = np.asarray(tcp_results.latency_vals)
+    rpsv_values = np.asarray(rpsv_results.latency_vals)
+    present = [v for v in (tcp_values, rpsv_values) if len(v)]
+    has_data = bool(present)
+    if has_data:
+        # Shared bin edges so both distributions are binned identically
+        lo = min(v.min() for v in present)
+        hi = max(v.max() for v in present)
+        edges = np.histogram_bin_edges(present[0], bins=30, range=(lo, hi))
+        if len(tcp_values):
+            _hist_bars(ax1, tcp_values, edges, alpha=0.6, label='TCP', color='blue', edgecolor='black')
+        if len(rpsv_values):
+            _hist_bars(ax1, rpsv_values, edges, alpha=0.6, label='RPSV', color='green', edgecolor='black')
+    else:
         ax1.text(0.5, 0.5, 'No latency data', ha='center', va='center', transform=ax1.transAxes)
     ax1.set_xlabel('Latency (ms)')
     ax1.set_ylabel('Frequency')
@@ -349,8 +753,8 @@ def generate_plots(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
     # Plot 3: Playback Error Distribution (RPSV only)
     ax3 = axes[1, 0]
     if rpsv_results.playback_errors:
-        errors = [abs(e) for e in rpsv_results.playback_errors]
-        ax3.hist(errors, bins=30, alpha=0.7, color='green', edgecolor='black')
+        errors = np.abs(np.asarray(rpsv_results.playback_errors))
+        _hist_bars(ax3, errors, 30, alpha=0.7, color='green', edgecolor='black')
         ax3.axvline(x=5, color='red', linestyle='--', alpha=0.7, label='Target (<5ms)')
         ax3.set_xlabel('Playback Error (ms)')
         ax3.set_ylabel('Frequency')
@@ -360,9 +764,13 @@ def generate_plots(tcp_results: AnalysisResults, rpsv_results: AnalysisResults):
     
     # Plot 4: Buffer Size Evolution (RPSV only)
     ax4 = axes[1, 1]
-    if rpsv_results.buffer_sizes:
-        buffer_samples = [sample.value for sample in rpsv_results.buffer_sizes[:200]]  # First 200 samples
-        ax4.plot(buffer_samples, '-', linewidth=2, color='green', alpha=0.7)
+    if rpsv_results.buffer_vals:
+        buffer_samples = np.asarray(rpsv_results.buffer_vals)
+        if len(buffer_samples) > _PLOT_MAX_POINTS:
+            idx = _downsample_indices(buffer_samples, _PLOT_TARGET_POINTS)
+            ax4.plot(idx, buffer_samples[idx], '-', linewidth=2, color='green', alpha=0.7)
+        else:
+            ax4.plot(buffer_samples, '-', linewidth=2, color='green', alpha=0.7)
         ax4.set_xlabel('Time (samples)')
         ax4.set_ylabel('Buffer Size (ms)')
         ax4.set_title('Adaptive Buffer Size Evolution')
@@ -378,38 +786,39 @@ def export_to_csv(tcp_results: AnalysisResults, rpsv_results: AnalysisResults, o
     """Export statistics to CSV"""
     import csv
     
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Metric', 'Protocol', 'Value'])
-        
-        # TCP metrics
-        if tcp_results.latency_stats():
-            stats = tcp_results.latency_stats()
-            writer.writerow(['Latency Mean', 'TCP', f"{stats['mean']:.2f}"])
-            writer.writerow(['Latency StdDev', 'TCP', f"{stats['stddev']:.2f}"])
-            writer.writerow(['Latency P95', 'TCP', f"{stats['p95']:.2f}"])
-        
-        if tcp_results.jitter_stats():
-            stats = tcp_results.jitter_stats()
-            writer.writerow(['Inter-arrival StdDev', 'TCP', f"{stats['stddev']:.2f}"])
-            writer.writerow(['Inter-arrival Variance', 'TCP', f"{stats['variance']:.2f}"])
-        
-        # RPSV metrics
-        if rpsv_results.jitter_stats():
-            stats = rpsv_results.jitter_stats()
-            writer.writerow(['Inter-playback StdDev', 'RPSV', f"{stats['stddev']:.2f}"])
-            writer.writerow(['Inter-playback Variance', 'RPSV', f"{stats['variance']:.2f}"])
-        
-        if rpsv_results.playback_error_stats():
-            stats = rpsv_results.playback_error_stats()
-            writer.writerow(['Playback Error Mean', 'RPSV', f"{stats['mean']:.2f}"])
-            writer.writerow(['Playback Error P95', 'RPSV', f"{stats['p95']:.2f}"])
-        
-        # RPSV RTT (latency proxy)
-        if rpsv_results.latency_stats():
-            stats = rpsv_results.latency_stats()
-            writer.writerow(['RTC RTT Mean', 'RPSV', f"{stats['mean']:.2f}"])
-            writer.writerow(['RTC RTT P95', 'RPSV', f"{stats['p95']:.2f}"])
+    rows = [['Metric', 'Protocol', 'Value']]
+    
+    # TCP metrics
+    stats = tcp_results.latency_stats
+    if stats:
+        rows.append(['Latency Mean', 'TCP', f"{stats['mean']:.2f}"])
+        rows.append(['Latency StdDev', 'TCP', f"{stats['stddev']:.2f}"])
+        rows.append(['Latency P95', 'TCP', f"{stats['p95']:.2f}"])
+    
+    stats = tcp_results.jitter_stats
+    if stats:
+        rows.append(['Inter-arrival StdDev', 'TCP', f"{stats['stddev']:.2f}"])
+        rows.append(['Inter-arrival Variance', 'TCP', f"{stats['variance']:.2f}"])
+    
+    # RPSV metrics
+    stats = rpsv_results.jitter_stats
+    if stats:
+        rows.append(['Inter-playback StdDev', 'RPSV', f"{stats['stddev']:.2f}"])
+        rows.append(['Inter-playback Variance', 'RPSV', f"{stats['variance']:.2f}"])
+    
+    stats = rpsv_results.playback_error_stats
+    if stats:
+        rows.append(['Playback Error Mean', 'RPSV', f"{stats['mean']:.2f}"])
+        rows.append(['Playback Error P95', 'RPSV', f"{stats['p95']:.2f}"])
+    
+    # RPSV RTT (latency proxy)
+    stats = rpsv_results.latency_stats
+    if stats:
+        rows.append(['RTC RTT Mean', 'RPSV', f"{stats['mean']:.2f}"])
+        rows.append(['RTC RTT P95', 'RPSV', f"{stats['p95']:.2f}"])
+    
+    with open(output_file, 'w', newline='', buffering=1 << 20) as f:
+        csv.writer(f).writerows(rows)
     
     print(f"SUCCESS: Exported CSV to: {output_file}")
 
@@ -422,6 +831,9 @@ def main():
     parser.add_argument('--dev-stats', type=str, help='Path to Dev Stats JSON file or directory')
     parser.add_argument('--output', type=str, default='rpsv_analysis.png', help='Output plot filename')
     parser.add_argument('--csv', action='store_true', help='Export CSV results')
+    parser.add_argument('--no-plots', action='store_true', help='Skip plot generation (matplotlib is not imported)')
+    parser.add_argument('--summary-only', action='store_true', help='Keep running statistics instead of samples (no plots; bounded memory)')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes for large logs (default: CPU count)')
     
     args = parser.parse_args()
     
@@ -431,8 +843,8 @@ def main():
     
     # Parse logs
     if args.log:
-        log_parser = LogParser()
-        log_parser.parse_log_file(Path(args.log))
+        log_parser = LogParser(summary_only=args.summary_only)
+        log_parser.parse_log_file(Path(args.log), workers=args.jobs)
         
         print(f"\nExtracted metrics from log:")
         print(f"   TCP latencies: {len(log_parser.tcp_latencies)} samples")
@@ -443,29 +855,38 @@ def main():
         print(f"   RPSV RTC RTTs: {len(log_parser.rpsv_rtt)} samples")
         
         # Convert to results
-        for i, lat in enumerate(log_parser.tcp_latencies):
-            tcp_results.latency_samples.append(MetricSample(i, lat, 'tcp'))
-        
-        for i, error in enumerate(log_parser.rpsv_playback_errors):
-            rpsv_results.playback_errors.append(error)
-        
-        for i, interval in enumerate(log_parser.rpsv_inter_playback):
-            rpsv_results.inter_playback_times.append(interval)
-        
-        for i, buf in enumerate(log_parser.rpsv_buffer_sizes):
-            rpsv_results.buffer_sizes.append(MetricSample(i, buf, 'rpsv'))
-        
-        # RPSV RTC RTT as latency proxy
-        for i, rtt in enumerate(log_parser.rpsv_rtt):
-            rpsv_results.latency_samples.append(MetricSample(i, rtt, 'rpsv'))
+        if args.summary_only:
+            # The accumulators move over as they are; there are no samples to copy
+            tcp_results.latency_vals = log_parser.tcp_latencies
+            rpsv_results.playback_errors = log_parser.rpsv_playback_errors
+            rpsv_results.inter_playback_times = log_parser.rpsv_inter_playback
+            rpsv_results.buffer_vals = log_parser.rpsv_buffer_sizes
+            rpsv_results.latency_vals = log_parser.rpsv_rtt
+        else:
+            tcp_results.latency_ts.extend(range(len(log_parser.tcp_latencies)))
+            tcp_results.latency_vals.extend(log_parser.tcp_latencies)
+            
+            rpsv_results.playback_errors.extend(log_parser.rpsv_playback_errors)
+            rpsv_results.inter_playback_times.extend(log_parser.rpsv_inter_playback)
+            
+            rpsv_results.buffer_ts.extend(range(len(log_parser.rpsv_buffer_sizes)))
+            rpsv_results.buffer_vals.extend(log_parser.rpsv_buffer_sizes)
+            
+            # RPSV RTC RTT as latency proxy
+            rpsv_results.latency_ts.extend(range(len(log_parser.rpsv_rtt)))
+            rpsv_results.latency_vals.extend(log_parser.rpsv_rtt)
         
         # TCP inter-arrival from timestamps
         if len(log_parser.tcp_timestamps) >= 2:
-            ts = sorted(log_parser.tcp_timestamps)
-            for a, b in zip(ts, ts[1:]):
-                dt = b - a
-                if dt > 0:
-                    tcp_results.inter_arrival_times.append(dt)
+            if _get_np():
+                dt = np.diff(np.sort(np.asarray(log_parser.tcp_timestamps, dtype=np.float64)))
+                tcp_results.inter_arrival_times.frombytes(dt[dt > 0].tobytes())
+            else:
+                ts = sorted(log_parser.tcp_timestamps)
+                for a, b in zip(ts, ts[1:]):
+                    dt = b - a
+                    if dt > 0:
+                        tcp_results.inter_arrival_times.append(dt)
     
     # Parse Dev Stats
     if args.dev_stats:
@@ -481,17 +902,16 @@ def main():
             if snapshot.get('clients'):
                 for client in snapshot['clients']:
                     if client.get('latencyHistory'):
-                        for lat in client['latencyHistory']:
-                            rpsv_results.latency_samples.append(
-                                MetricSample(snapshot.get('serverTime', 0), lat, 'rpsv')
-                            )
-                    if client.get('bufferSizeMs'):
-                        rpsv_results.buffer_sizes.append(
-                            MetricSample(snapshot.get('serverTime', 0), client['bufferSizeMs'], 'rpsv')
-                        )
+                        history = client['latencyHistory']
+                        rpsv_results.latency_ts.extend([snapshot.get('serverTime', 0)] * len(history))
+                        rpsv_results.latency_vals.extend(history)
+                    buffer = _buffer_ms(client.get('bufferSizeMs'))
+                    if buffer:
+                        rpsv_results.buffer_ts.append(snapshot.get('serverTime', 0))
+                        rpsv_results.buffer_vals.append(buffer)
     
     # Validate we have data
-    has_tcp = len(tcp_results.latency_samples) > 0
+    has_tcp = len(tcp_results.latency_vals) > 0
     has_rpsv_errors = len(rpsv_results.playback_errors) > 0
     has_rpsv_interplayback = len(rpsv_results.inter_playback_times) > 0
     
@@ -504,7 +924,7 @@ def main():
         return
     
     if has_tcp:
-        print(f"\n[OK] TCP data found: {len(tcp_results.latency_samples)} latency samples")
+        print(f"\n[OK] TCP data found: {len(tcp_results.latency_vals)} latency samples")
     else:
         print("\n[WARNING] No TCP data found - only tested RPSV mode?")
     
@@ -514,7 +934,7 @@ def main():
         print("\n[WARNING] No RPSV data found - only tested TCP mode?")
     
     # Run analysis
-    analyze(tcp_results, rpsv_results)
+    analyze(tcp_results, rpsv_results, plots=not (args.no_plots or args.summary_only))
     
     # Export CSV if requested
     if args.csv: